@@ -5,84 +5,262 @@ FastAPI TCP server serving metrics from Host/output/latest.json
 Port: 9999
 """
 
+import os
 import json
 import time
-import subprocess
+import asyncio
+import threading
+import importlib.util
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+import anyio
 import uvicorn
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as _JSONResponse
+    _JSON_DECODE_ERRORS = (json.JSONDecodeError, orjson.JSONDecodeError)
+except ImportError:  # Optional; fall back to the stdlib encoder
+    orjson = None
+    _JSONResponse = JSONResponse
+    _JSON_DECODE_ERRORS = (json.JSONDecodeError,)
 
 # Configuration
 API_PORT = 8888
 API_HOST = "0.0.0.0"
 METRICS_FILE = Path(__file__).parent.parent / "output" / "latest.json"
 MONITOR_SCRIPT = Path(__file__).parent.parent / "scripts" / "main_monitor.sh"
+THREADPOOL_SIZE = 100  # Worker threads for sync endpoints (anyio default: 40)
+REFRESH_MIN_INTERVAL = 0.5  # Seconds a successful /refresh result is reused
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Size the threadpool that sync endpoints (/metrics) are dispatched to.
+    
+    File reads happen there rather than on the event loop, so the pool
+    size caps how many /metrics requests can be in flight at once.
+    """
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    yield
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Host System Monitor API",
     description="TCP API serving system metrics from host monitoring",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=_JSONResponse,
+    lifespan=lifespan
 )
 
+# Metric dumps are repetitive JSON and compress well; small bodies such as
+# /health stay below minimum_size and are sent uncompressed
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
+# (file_timestamp, raw latest.json contents) keyed on (st_mtime_ns, st_size)
+# so only the first request after a monitor refresh pays for reading the
+# file. Sync endpoints run in Starlette's threadpool, hence a thread lock;
+# it also guards the long-lived latest.json descriptor.
+_cache: Dict[str, Any] = {"key": None, "entry": None}
+_cache_lock = threading.Lock()
+_metrics_fd: Optional[int] = None
+
+
+def _dumps(data: Any) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+# Static response bodies, serialized once at import
+_ROOT_BYTES = _dumps({
+    "name": "Host System Monitor API",
+    "version": "1.0.0",
+    "endpoints": {
+        "/": "This endpoint (API info)",
+        "/health": "Health check",
+        "/metrics": "Current system metrics"
+    },
+    "metrics_file": str(METRICS_FILE),
+    "docs": "/docs (Swagger UI)",
+    "redoc": "/redoc (ReDoc)"
+})
+# /health only differs by timestamp, filled into "%s" per request
+_HEALTH_TEMPLATE = _dumps({
+    "status": "ok",
+    "service": "host-monitor-api",
+    "port": str(API_PORT),
+    "timestamp": "%s"
+})
+
+# Last formatted UTC second as (epoch_seconds, iso_bytes)
+_iso_cache = (0, b"")
+
+# Monitor run shared by concurrent /refresh callers, and when it finished
+_refresh_task: Optional[asyncio.Task] = None
+_refresh_done_at = 0.0
+
+
+def _iso_now() -> bytes:
+    """
+    Current UTC time as ISO-8601 bytes, formatted at most once per second.
+    
+    Returns:
+        bytes: Timestamp such as b"2025-12-05T10:30:00Z"
+    """
+    global _iso_cache
+    now = int(time.time())
+    cached_sec, cached_iso = _iso_cache
+    if now != cached_sec:
+        cached_iso = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)).encode()
+        _iso_cache = (now, cached_iso)
+    return cached_iso
+
+
+def _stat_metrics_file() -> os.stat_result:
+    """
+    fstat() the open latest.json descriptor, reopening it if the file was replaced.
+    
+    Keeping the file open turns the per-request freshness check into an
+    fstat() with no path lookup. main_monitor.sh renames a new file over
+    latest.json, which drops the old inode's link count to zero - that is
+    the signal to reopen. Callers must hold _cache_lock.
+    
+    Returns:
+        os.stat_result: Status of the file _metrics_fd now refers to
+        
+    Raises:
+        FileNotFoundError: If latest.json does not exist
+    """
+    global _metrics_fd
+    if _metrics_fd is not None:
+        st = os.fstat(_metrics_fd)
+        if st.st_nlink:
+            return st
+        os.close(_metrics_fd)
+        _metrics_fd = None
+    _metrics_fd = os.open(str(METRICS_FILE), os.O_RDONLY)
+    return os.fstat(_metrics_fd)
+
 
-@app.get("/health")
-async def health_check() -> Dict[str, str]:
+def _read_metrics_file(size: int) -> bytes:
+    """
+    Read the open latest.json with a single pread().
+    
+    The result is a private snapshot, so it stays valid even if the file
+    is later truncated or rewritten in place. latest.json is a few KB,
+    well under a page, so mapping it would save nothing and would turn
+    an in-place truncation into a SIGBUS on the next read.
+    Callers must hold _cache_lock.
+    
+    Args:
+        size: File size from _stat_metrics_file()
+    
+    Returns:
+        bytes: File contents
+    """
+    return os.pread(_metrics_fd, size, 0)
+
+
+def _looks_like_json(raw) -> bool:
+    """
+    Cheap structural check that the file holds one complete JSON document.
+    
+    Only the first and last non-whitespace bytes are inspected, which is
+    enough to catch an empty or truncated file without parsing it.
+    
+    Args:
+        raw: File contents
+    
+    Returns:
+        bool: True if the contents open with { or [ and close with } or ]
+    """
+    first = raw[:64].lstrip()[:1]
+    last = raw[-64:].rstrip()[-1:]
+    return first in (b"{", b"[") and last in (b"}", b"]")
+
+
+@app.get("/health", response_model=None)
+async def health_check() -> Response:
     """
     Health check endpoint
     
     Returns:
-        dict: Health status
+        Response: Health status
     """
-    return {
-        "status": "ok",
-        "service": "host-monitor-api",
-        "port": str(API_PORT),
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    }
+    return Response(content=_HEALTH_TEMPLATE % _iso_now(), media_type="application/json")
 
 
-@app.get("/metrics")
-async def get_metrics() -> Dict[str, Any]:
+@app.get("/metrics", response_model=None)
+def get_metrics(validate: bool = False) -> Response:
     """
     Get current system metrics from latest.json
     
+    The file is already JSON, so its bytes are spliced into the response
+    envelope as-is instead of being parsed and re-serialized. By default
+    only a cheap structural check guards against truncated files.
+    
+    Args:
+        validate: Also fully parse the metrics file before serving it (?validate=1)
+    
     Returns:
-        dict: System metrics including CPU, memory, disk, network, temperature, GPU, etc.
+        Response: System metrics including CPU, memory, disk, network, temperature, GPU, etc.
         
     Raises:
         HTTPException: If metrics file is not found or invalid
     """
     try:
-        if not METRICS_FILE.exists():
+        # A single fstat() per request; the file is only re-read once it changed
+        try:
+            with _cache_lock:
+                st = _stat_metrics_file()
+                key = (st.st_mtime_ns, st.st_size)
+                if _cache["key"] != key:
+                    metrics_raw = _read_metrics_file(st.st_size)
+                    if not _looks_like_json(metrics_raw):
+                        raise HTTPException(
+                            status_code=500,
+                            detail="Invalid JSON in metrics file: empty or truncated"
+                        )
+                    _cache["entry"] = (
+                        time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(st.st_mtime)).encode(),
+                        metrics_raw
+                    )
+                    _cache["key"] = key
+                file_timestamp, metrics_raw = _cache["entry"]
+        except FileNotFoundError:
             # Return empty data with helpful message if file doesn't exist yet
-            return {
+            return _JSONResponse(content={
                 "status": "waiting",
                 "message": "Metrics file not yet generated. Run host_monitor_loop.sh to start collecting data.",
                 "file": str(METRICS_FILE),
                 "data": {}
-            }
-        
-        # Read metrics file
-        with METRICS_FILE.open('r', encoding='utf-8') as f:
-            metrics_data = json.load(f)
+            })
         
-        # Get file modification time
-        file_mtime = METRICS_FILE.stat().st_mtime
-        file_timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(file_mtime))
+        if validate:
+            if orjson is not None:
+                orjson.loads(metrics_raw)
+            else:
+                json.loads(metrics_raw)
         
         # Return metrics with metadata
-        return {
-            "status": "ok",
-            "file_timestamp": file_timestamp,
-            "server_timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-            "data": metrics_data
-        }
+        body = b"".join((
+            b'{"status":"ok","file_timestamp":"', file_timestamp,
+            b'","server_timestamp":"', _iso_now(),
+            b'","data":', metrics_raw, b"}"
+        ))
+        return Response(content=body, media_type="application/json")
         
-    except json.JSONDecodeError as e:
+    except HTTPException:
+        raise
+    except _JSON_DECODE_ERRORS as e:
         raise HTTPException(
             status_code=500,
             detail=f"Invalid JSON in metrics file: {str(e)}"
@@ -94,11 +272,17 @@ async def get_metrics() -> Dict[str, Any]:
         )
 
 
-@app.post("/refresh")
-async def refresh_metrics() -> Dict[str, Any]:
+async def _run_monitor_script() -> Dict[str, Any]:
     """
-    Trigger manual refresh of metrics by running main_monitor.sh
+    Run main_monitor.sh once and report how long it took.
+    
+    Returns:
+        dict: Refresh status and duration
+        
+    Raises:
+        HTTPException: If the script is missing, fails or times out
     """
+    global _refresh_done_at
     try:
         if not MONITOR_SCRIPT.exists():
             raise HTTPException(
@@ -106,20 +290,25 @@ async def refresh_metrics() -> Dict[str, Any]:
                 detail=f"Monitor script not found at {MONITOR_SCRIPT}"
             )
 
-        # Run the script
+        # Run the script without blocking the event loop
         start_time = time.time()
-        result = subprocess.run(
-            ["bash", str(MONITOR_SCRIPT)],
-            capture_output=True,
-            text=True,
-            timeout=10  # 10s timeout
+        proc = await asyncio.create_subprocess_exec(
+            "bash", str(MONITOR_SCRIPT),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
+        try:
+            _, stderr = await asyncio.wait_for(proc.communicate(), timeout=10)  # 10s timeout
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
         duration = time.time() - start_time
 
-        if result.returncode != 0:
+        if proc.returncode != 0:
             raise HTTPException(
                 status_code=500,
-                detail=f"Monitor script failed: {result.stderr}"
+                detail=f"Monitor script failed: {stderr.decode(errors='replace')}"
             )
 
         return {
@@ -128,7 +317,7 @@ async def refresh_metrics() -> Dict[str, Any]:
             "duration": f"{duration:.2f}s"
         }
 
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         raise HTTPException(
             status_code=504,
             detail="Monitor script timed out"
@@ -138,38 +327,68 @@ async def refresh_metrics() -> Dict[str, Any]:
             status_code=500,
             detail=f"Refresh failed: {str(e)}"
         )
+    finally:
+        _refresh_done_at = time.monotonic()
+
+
+@app.post("/refresh", response_model=None)
+async def refresh_metrics() -> Response:
+    """
+    Trigger manual refresh of metrics by running main_monitor.sh
+    
+    Overlapping requests share a single run of the script, and a run that
+    succeeded less than REFRESH_MIN_INTERVAL ago is reused rather than
+    re-executed back-to-back.
+    """
+    global _refresh_task
+    task = _refresh_task
+    # No await between the check and create_task, so this is atomic on the loop
+    if task is None or (task.done() and (
+            task.cancelled() or task.exception() is not None
+            or time.monotonic() - _refresh_done_at >= REFRESH_MIN_INTERVAL)):
+        task = _refresh_task = asyncio.create_task(_run_monitor_script())
+    # Shield so a disconnecting client doesn't cancel the run for the others
+    return _JSONResponse(content=await asyncio.shield(task))
 
 
-@app.get("/")
-async def root() -> Dict[str, Any]:
+@app.get("/", response_model=None)
+async def root() -> Response:
     """
     Root endpoint with API information
     
     Returns:
-        dict: API documentation
+        Response: API documentation
+    """
+    return Response(content=_ROOT_BYTES, media_type="application/json")
+
+
+def _server_backends() -> Dict[str, str]:
+    """
+    Pick the fastest event loop / HTTP parser available.
+
+    uvloop and httptools ship with uvicorn[standard]; fall back to the
+    pure-Python asyncio + h11 stack when they are not installed.
+
+    Returns:
+        dict: Keyword arguments for uvicorn.run (loop, http)
     """
     return {
-        "name": "Host System Monitor API",
-        "version": "1.0.0",
-        "endpoints": {
-            "/": "This endpoint (API info)",
-            "/health": "Health check",
-            "/metrics": "Current system metrics"
-        },
-        "metrics_file": str(METRICS_FILE),
-        "docs": "/docs (Swagger UI)",
-        "redoc": "/redoc (ReDoc)"
+        "loop": "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "http": "httptools" if importlib.util.find_spec("httptools") else "h11"
     }
 
 
 def main():
     """Start the FastAPI server"""
+    backends = _server_backends()
+
     print("=" * 60)
     print("  Host System Monitor - TCP API Server")
     print("=" * 60)
     print()
     print(f"[*] Starting API server on {API_HOST}:{API_PORT}")
     print(f"[*] Metrics file: {METRICS_FILE}")
+    print(f"[*] Event loop: {backends['loop']}, HTTP parser: {backends['http']}")
     print()
     print(f"[*] Endpoints:")
     print(f"   - GET  http://localhost:{API_PORT}/         (API Info)")
@@ -186,7 +405,8 @@ def main():
         host=API_HOST,
         port=API_PORT,
         log_level="info",
-        access_log=True
+        access_log=True,
+        **backends
     )
 
 
@@ -81,6 +81,7 @@ done
 log_info "Merging JSON outputs"
 
 LATEST_OUTPUT="${OUTPUT_DIR}/latest.json"
+LATEST_TMP="${OUTPUT_DIR}/.latest.json.tmp"
 TIMESTAMP=$(date -u +"%Y-%m-%dT%H:%M:%SZ" 2>/dev/null || date +"%Y-%m-%dT%H:%M:%SZ")
 
 # Build merged JSON with metadata and proper structure
@@ -147,7 +148,10 @@ sections_added=0
     
     echo ""
     echo "}"
-} > "${LATEST_OUTPUT}"
+} > "${LATEST_TMP}"
+
+# Replace atomically so readers never see a truncated or half-written file
+mv -f "${LATEST_TMP}" "${LATEST_OUTPUT}"
 
 # Log merge status AFTER JSON generation
 for file in "${temp_files[@]}"; do
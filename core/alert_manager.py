@@ -3,13 +3,34 @@ Alert Manager Module
 
 Manages system alerts by reading from alerts.json and providing
 filtering and sorting capabilities.
+
+alerts.json is stored as JSON Lines: a header line
+({"timestamp": ..., "alerts": [...]}) followed by one alert per line,
+so adding an alert is a single append. New alerts are buffered in
+memory and appended in batches (see flush_alerts). Alerts are stamped when they
+are appended, so the file runs oldest to newest and the newest alerts
+can be read from the end. Files in the older single-document layout are
+still read, and converted on the next write.
 """
 
+import os
+import sys
 import json
+import mmap
+import atexit
 import logging
+import threading
+from collections import Counter, defaultdict
+from heapq import nlargest
+from bisect import bisect_left
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timezone
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
+from datetime import datetime, timedelta, timezone
+
+try:
+    import orjson
+except ImportError:  # Optional; fall back to the stdlib parser
+    orjson = None
 
 # Configure logging
 logging.basicConfig(
@@ -23,6 +44,464 @@ DEFAULT_ALERTS_PATH = "data/alerts/alerts.json"
 
 # Alert levels
 ALERT_LEVELS = ['info', 'warning', 'critical']
+_VALID_LEVELS = frozenset(ALERT_LEVELS)
+
+# Low-cardinality string fields shared across alerts; interned on load so
+# every "warning" or "cpu" is one object instead of one per alert
+_INTERNED_FIELDS = ('level', 'metric')
+
+# Read size when scanning an alerts file backwards from the end
+_TAIL_CHUNK_SIZE = 64 * 1024
+
+# Files at least this large are parsed from an mmap instead of one big read
+_MMAP_THRESHOLD = 1024 * 1024
+
+# Write-behind buffer: alerts not yet appended, per file. Flushed once
+# _FLUSH_THRESHOLD alerts are queued, by a timer _FLUSH_INTERVAL seconds
+# after the first one was queued, before a read, and at exit.
+_FLUSH_THRESHOLD = 50
+_FLUSH_INTERVAL = 1.0
+_pending: Dict[str, List[Dict[str, Any]]] = {}
+_flush_timers: Dict[str, threading.Timer] = {}
+_pending_lock = threading.Lock()
+
+# An alert repeating a (metric, level, message) seen within this window is
+# skipped; once the window has passed the condition is recorded again
+_DEDUP_WINDOW = timedelta(minutes=5)
+
+# Per-file map of (metric, level, message) to the newest timestamp stored or
+# queued, tagged with the file's (mtime_ns, size) so outside rewrites invalidate it
+_dedup_index: Dict[str, Tuple[Optional[Tuple[int, int]], Dict[Tuple[Any, Any, Any], str]]] = {}
+
+# Per-file alerts grouped by metric, and the (timestamps, values) series
+# built from them on demand, tagged with the file's (mtime_ns, size). One
+# entry per path, so a new version replaces the old one instead of piling up.
+_metric_cache: Dict[str, Tuple[Tuple[int, int], Dict[Any, Tuple[Dict[str, Any], ...]], Dict[str, Any]]] = {}
+_metric_cache_lock = threading.Lock()
+
+
+def _loads(raw: bytes) -> Any:
+    """Parse JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _dump_line(data: Any) -> bytes:
+    """Serialize data to one newline-terminated JSON line, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(data).encode('utf-8') + b'\n'
+
+
+def _new_header() -> Dict[str, Any]:
+    """Header line written at the top of a new alerts file."""
+    return {
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "alerts": []
+    }
+
+
+def _intern_fields(alert: Any) -> Any:
+    """Intern an alert's level and metric strings in place; non-dicts pass through."""
+    if isinstance(alert, dict):
+        for field in _INTERNED_FIELDS:
+            value = alert.get(field)
+            if type(value) is str:
+                alert[field] = sys.intern(value)
+    return alert
+
+
+def _parse_alerts(raw: Union[bytes, mmap.mmap]) -> List[Dict[str, Any]]:
+    """
+    Parse the contents of an alerts file into alerts in file order (oldest first).
+    
+    Args:
+        raw: File contents (bytes, or an mmap of the file read line by
+             line), JSON Lines or the older single-document layout
+        
+    Returns:
+        list: Alert dictionaries
+        
+    Raises:
+        json.JSONDecodeError: If the file is not valid JSON in either layout
+        ValueError: If the document has no usable alerts list
+    """
+    source = iter(raw.readline, b'') if isinstance(raw, mmap.mmap) else raw.splitlines()
+    lines = (line for line in source if line.strip())
+    
+    first_line = next(lines, None)
+    if first_line is None:
+        return []
+    
+    try:
+        first = _loads(first_line)
+    except json.JSONDecodeError:
+        # Pretty-printed single document (pre JSON Lines layout)
+        first = _loads(raw[:] if isinstance(raw, mmap.mmap) else raw)
+        lines = iter(())
+    
+    if not isinstance(first, dict):
+        raise ValueError("expected a JSON object")
+    
+    if 'alerts' in first:
+        alerts = first['alerts']
+        if not isinstance(alerts, list):
+            raise ValueError("'alerts' is not a list")
+        alerts = [_intern_fields(a) for a in alerts]
+    else:
+        alerts = [_intern_fields(first)]
+    
+    for line_no, line in enumerate(lines, start=2):
+        try:
+            alert = _loads(line)
+        except json.JSONDecodeError:
+            # Typically a partially written last line; keep the rest
+            logger.warning(f"Skipping malformed alert on line {line_no}")
+            continue
+        if isinstance(alert, dict):
+            alerts.append(_intern_fields(alert))
+    
+    return alerts
+
+
+def _read_alerts_file(alerts_path: Path) -> List[Dict[str, Any]]:
+    """
+    Read and parse a whole alerts file.
+    
+    Large files are mapped and parsed line by line, so the file is never
+    copied into one bytes object.
+    
+    Args:
+        alerts_path: Path to the alerts file
+        
+    Returns:
+        list: Alert dictionaries in file order (oldest first)
+    """
+    with alerts_path.open('rb') as f:
+        if os.fstat(f.fileno()).st_size < _MMAP_THRESHOLD:
+            return _parse_alerts(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _parse_alerts(mm)
+
+
+def _ensure_jsonl(alerts_path: Path) -> bytes:
+    """
+    Make sure an alerts file is in JSON Lines layout, ready for appends.
+    
+    Files in the single-document layout are rewritten once as a header
+    plus one alert per line. For a missing file, or one whose last line
+    is unterminated, the bytes needed are returned instead of written, so
+    the caller can send them in the same write as its alerts.
+    
+    Args:
+        alerts_path: Path to the alerts file
+        
+    Returns:
+        bytes: Prefix to write before the first appended line
+    """
+    if not alerts_path.exists():
+        alerts_path.parent.mkdir(parents=True, exist_ok=True)
+        return _dump_line(_new_header())
+    
+    with alerts_path.open('rb') as f:
+        first_line = f.readline()
+        try:
+            _loads(first_line)
+        except json.JSONDecodeError:
+            is_jsonl = False
+        else:
+            is_jsonl = True
+            f.seek(-1, os.SEEK_END)
+            missing_newline = f.read(1) != b'\n'
+    
+    if is_jsonl:
+        return b'\n' if missing_newline else b''
+    
+    alerts = _read_alerts_file(alerts_path)
+    try:
+        # Oldest first, matching the order appends produce
+        alerts.sort(key=_timestamp_key)
+    except Exception as e:
+        logger.warning(f"Error sorting alerts during conversion: {e}. Keeping file order.")
+    tmp_path = alerts_path.with_name(alerts_path.name + '.tmp')
+    tmp_path.write_bytes(b''.join([_dump_line(_new_header())] + [_dump_line(a) for a in alerts]))
+    os.replace(tmp_path, alerts_path)
+    logger.info(f"Converted {alerts_path} to JSON Lines ({len(alerts)} alerts)")
+    return b''
+
+
+def _iter_lines_reverse(f, start: int) -> Iterator[bytes]:
+    """
+    Yield the lines of a binary file from the end back to offset start.
+    
+    Args:
+        f: File opened in binary mode
+        start: Offset where the scanned region begins (start of a line)
+    """
+    pos = f.seek(0, os.SEEK_END)
+    remainder = b''
+    while pos > start:
+        step = min(_TAIL_CHUNK_SIZE, pos - start)
+        pos -= step
+        f.seek(pos)
+        lines = (f.read(step) + remainder).split(b'\n')
+        # The first piece may be the tail of a line that starts in the next chunk back
+        remainder = lines[0]
+        for line in reversed(lines[1:]):
+            yield line
+    yield remainder
+
+
+def _tail_alerts(
+    alerts_path: Path,
+    limit: int,
+    level_filter: Optional[str] = None
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Read the newest alerts by scanning a JSON Lines file from the end.
+    
+    Once limit matching alerts are found, scanning continues only until a
+    run of more than _FLUSH_THRESHOLD older lines is seen, so only the tail
+    of the file is read and parsed. The extra run picks up the rest of a
+    same-second tie and a batch another process flushed out of order (a
+    batch is at most _FLUSH_THRESHOLD lines). The candidates are then
+    ranked exactly as the full-parse path ranks the whole file.
+    
+    Args:
+        alerts_path: Path to the alerts file
+        limit: Number of alerts to return
+        level_filter: Optional level to match
+        
+    Returns:
+        list or None: Up to limit alerts, newest first, or None if the
+                      file is not in JSON Lines layout
+    """
+    with alerts_path.open('rb') as f:
+        header_line = f.readline()
+        if not header_line.strip():
+            return None
+        try:
+            header = _loads(header_line)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(header, dict):
+            return None
+        header_alerts = header['alerts'] if 'alerts' in header else [header]
+        if not isinstance(header_alerts, list):
+            return None
+        
+        # Matching alerts, last line first, and the limit-th newest timestamp
+        # once that many have been seen
+        candidates = []
+        boundary = None
+        older_run = 0
+        reached_start = True
+        for line in _iter_lines_reverse(f, f.tell()):
+            if not line.strip():
+                continue
+            try:
+                alert = _loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping malformed alert line in {alerts_path}")
+                continue
+            if not isinstance(alert, dict):
+                continue
+            if level_filter and alert.get('level') != level_filter:
+                continue
+            ts = _timestamp_key(alert)
+            if not isinstance(ts, str):
+                ts = ''
+            if boundary is not None and ts < boundary:
+                older_run += 1
+                if older_run > _FLUSH_THRESHOLD:
+                    reached_start = False
+                    break
+                continue
+            older_run = 0
+            candidates.append(_intern_fields(alert))
+            if boundary is None and len(candidates) == limit:
+                boundary = min(
+                    (t if isinstance(t, str) else '' for t in map(_timestamp_key, candidates)),
+                    default=''
+                )
+    
+    # Back to file order, so ties rank the way the full-parse path ranks them
+    candidates.reverse()
+    if reached_start:
+        # Alerts carried in the header predate every appended line
+        if level_filter:
+            header_alerts = [a for a in header_alerts if a.get('level') == level_filter]
+        candidates[:0] = [_intern_fields(a) for a in header_alerts]
+    return _latest_alerts(candidates, limit)
+
+
+def _file_key(path: Path) -> Tuple[int, int]:
+    """Cheap change-detection key for a file: (mtime_ns, size)."""
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _alert_key(alert: Dict[str, Any]) -> Tuple[Any, Any, Any]:
+    """Identity of an alert for de-duplication."""
+    return (alert.get('metric'), alert.get('level'), alert.get('message'))
+
+
+def build_alert_index(alerts: List[Dict[str, Any]]) -> Dict[Tuple[Any, Any, Any], str]:
+    """
+    Build a de-duplication index for a list of alerts.
+    
+    Args:
+        alerts: List of alert dictionaries
+        
+    Returns:
+        dict: (metric, level, message) key -> newest timestamp for that key
+    """
+    index: Dict[Tuple[Any, Any, Any], str] = {}
+    for alert in alerts:
+        key = _alert_key(alert)
+        ts = _timestamp_key(alert)
+        # A null or numeric timestamp in a hand-edited file counts as very
+        # old rather than breaking every later add
+        if not isinstance(ts, str):
+            ts = ''
+        if ts >= index.get(key, ''):
+            index[key] = ts
+    return index
+
+
+def is_duplicate_alert(
+    index: Dict[Tuple[Any, Any, Any], str],
+    new_alert: Dict[str, Any],
+    window: timedelta = _DEDUP_WINDOW
+) -> bool:
+    """
+    Check whether an alert with the same metric, level and message was
+    raised within the last `window`.
+    
+    Build the index once with build_alert_index() and reuse it; each
+    check is then a single dict lookup instead of a scan of every alert.
+    
+    Args:
+        index: Index from build_alert_index()
+        new_alert: Alert dictionary to check
+        window: How far back an equivalent alert counts as a duplicate
+        
+    Returns:
+        bool: True if an equivalent alert is indexed within the window
+        
+    Example:
+        >>> index = build_alert_index(load_alerts())
+        >>> is_duplicate_alert(index, {'metric': 'cpu', 'level': 'warning', 'message': 'CPU usage above 80%'})
+        False
+    """
+    last = index.get(_alert_key(new_alert))
+    if last is None:
+        return False
+    cutoff = (datetime.now(timezone.utc) - window).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return last >= cutoff
+
+
+def _get_dedup_index(alerts_path: Path) -> Dict[Tuple[Any, Any, Any], str]:
+    """Return the de-duplication index for a file, rebuilding it if the file changed."""
+    cache_key = str(alerts_path)
+    try:
+        file_key = _file_key(alerts_path)
+    except FileNotFoundError:
+        file_key = None
+    cached = _dedup_index.get(cache_key)
+    if cached is not None and cached[0] == file_key:
+        return cached[1]
+    
+    stored = _read_alerts_file(alerts_path) if file_key is not None else []
+    index = build_alert_index(stored + _pending.get(cache_key, []))
+    _dedup_index[cache_key] = (file_key, index)
+    return index
+
+
+def _arm_flush_timer(cache_key: str) -> None:
+    """(Re)start the timer that flushes one file's queue. Caller holds _pending_lock."""
+    timer = _flush_timers.pop(cache_key, None)
+    if timer is not None:
+        timer.cancel()
+    # Daemon so a pending timer never holds up interpreter exit; the atexit
+    # hook flushes whatever is still queued
+    timer = threading.Timer(_FLUSH_INTERVAL, flush_alerts, args=(cache_key,))
+    timer.daemon = True
+    _flush_timers[cache_key] = timer
+    timer.start()
+
+
+def _cancel_flush_timer(cache_key: str) -> None:
+    """Stop one file's flush timer, if any. Caller holds _pending_lock."""
+    timer = _flush_timers.pop(cache_key, None)
+    if timer is not None:
+        timer.cancel()
+
+
+def _flush_pending(cache_key: str) -> bool:
+    """Append the buffered alerts for one file in a single write. Caller holds _pending_lock."""
+    queued = _pending.get(cache_key)
+    if not queued:
+        return True
+    
+    alerts_path = Path(cache_key)
+    try:
+        parts = [_ensure_jsonl(alerts_path)]
+        parts.extend(_dump_line(a) for a in queued)
+        # The batch is joined and handed over in one write() call; the
+        # buffered handle writes a payload larger than its buffer straight
+        # through, and retries a partial write until every byte is out
+        with alerts_path.open('ab') as f:
+            f.write(b''.join(parts))
+    except Exception as e:
+        # Keep them queued; the timer retries
+        logger.error(f"Error writing alerts to {alerts_path}: {e}")
+        _arm_flush_timer(cache_key)
+        return False
+    
+    del _pending[cache_key]
+    _cancel_flush_timer(cache_key)
+    
+    # Our own append must not invalidate the index
+    cached = _dedup_index.get(cache_key)
+    if cached is not None:
+        _dedup_index[cache_key] = (_file_key(alerts_path), cached[1])
+    
+    logger.debug(f"Wrote {len(queued)} alerts to {alerts_path}")
+    return True
+
+
+def flush_alerts(path: Optional[str] = None) -> bool:
+    """
+    Write buffered alerts to disk.
+    
+    add_alert queues alerts and writes them in batches; call this to make
+    them visible to other processes straight away. Runs automatically
+    _FLUSH_INTERVAL seconds after the first alert is queued, at
+    interpreter exit, and before load_alerts reads the same file.
+    
+    Args:
+        path: Alerts file to flush, or None for every file with queued alerts
+        
+    Returns:
+        bool: True if all queued alerts were written, False otherwise
+        
+    Example:
+        >>> add_alert('cpu', 'warning', 'CPU usage above 80%', 85.5, 80.0)
+        True
+        >>> flush_alerts()
+        True
+    """
+    with _pending_lock:
+        cache_keys = list(_pending) if path is None else [str(Path(path))]
+        ok = True
+        for cache_key in cache_keys:
+            ok = _flush_pending(cache_key) and ok
+        return ok
+
+
+atexit.register(flush_alerts)
 
 
 def load_alerts(
@@ -59,32 +538,36 @@ def load_alerts(
     alerts_path = Path(path)
     
     try:
+        # Include alerts this process has queued but not yet written
+        flush_alerts(path)
+        
         # Create empty file if it doesn't exist
         if not alerts_path.exists():
             logger.info(f"Alerts file not found. Creating empty file: {alerts_path}")
             create_empty_alerts_file(path)
             return []
         
-        with alerts_path.open('r', encoding='utf-8') as f:
-            data = json.load(f)
+        if level_filter not in _VALID_LEVELS:
+            level_filter = None
         
-        # Extract alerts list
-        alerts = data.get('alerts', [])
+        # The file is in append (time) order, so the newest N are at the end
+        if limit and limit > 0:
+            alerts = _tail_alerts(alerts_path, limit, level_filter)
+            if alerts is not None:
+                logger.debug(f"Loaded {len(alerts)} alerts from {alerts_path}")
+                return alerts
         
-        if not isinstance(alerts, list):
-            logger.warning(f"Invalid alerts format in {alerts_path}")
-            return []
+        alerts = _read_alerts_file(alerts_path)
         
         # Filter by level if specified
-        if level_filter and level_filter in ALERT_LEVELS:
+        if level_filter:
             alerts = [a for a in alerts if a.get('level') == level_filter]
         
-        # Sort by timestamp (newest first)
-        alerts = _sort_alerts_by_timestamp(alerts)
-        
-        # Apply limit if specified
+        # Sort by timestamp (newest first); with a limit only the top N are ordered
         if limit and limit > 0:
-            alerts = alerts[:limit]
+            alerts = _latest_alerts(alerts, limit)
+        else:
+            alerts = _sort_alerts_by_timestamp(alerts)
         
         logger.debug(f"Loaded {len(alerts)} alerts from {alerts_path}")
         return alerts
@@ -93,6 +576,10 @@ def load_alerts(
         logger.error(f"Invalid JSON in {alerts_path}: {e}")
         return []
         
+    except ValueError as e:
+        logger.warning(f"Invalid alerts format in {alerts_path}: {e}")
+        return []
+        
     except PermissionError as e:
         logger.error(f"Permission denied reading {alerts_path}: {e}")
         return []
@@ -122,14 +609,10 @@ def create_empty_alerts_file(path: str = DEFAULT_ALERTS_PATH) -> bool:
         # Ensure parent directory exists
         alerts_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Create empty alerts structure
-        empty_structure = {
-            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "alerts": []
-        }
-        
-        with alerts_path.open('w', encoding='utf-8') as f:
-            json.dump(empty_structure, f, indent=2)
+        # Header line only; alerts are appended below it
+        with alerts_path.open('wb') as f:
+            f.write(_dump_line(_new_header()))
+        _dedup_index.pop(str(alerts_path), None)
         
         logger.info(f"Created empty alerts file: {alerts_path}")
         return True
@@ -154,6 +637,12 @@ def add_alert(
     """
     Add a new alert to alerts.json.
     
+    The alert is queued and appended with others in a single write once
+    the buffer fills, or at most _FLUSH_INTERVAL seconds later (see
+    flush_alerts); existing alerts are not re-read or re-serialized. An
+    alert with the same metric, level and message as one raised in the
+    last five minutes is skipped.
+    
     Args:
         metric: Metric type (cpu, memory, disk, etc.)
         level: Alert level (info, warning, critical)
@@ -163,49 +652,51 @@ def add_alert(
         path: Path to alerts.json file
         
     Returns:
-        bool: True if alert added successfully, False otherwise
+        bool: True if alert added (or skipped as a recent repeat), False otherwise
         
     Example:
         >>> add_alert('cpu', 'warning', 'CPU usage above 80%', 85.5, 80.0)
         True
     """
-    if level not in ALERT_LEVELS:
+    if level not in _VALID_LEVELS:
         logger.error(f"Invalid alert level: {level}. Must be one of {ALERT_LEVELS}")
         return False
     
     alerts_path = Path(path)
     
+    cache_key = str(alerts_path)
+    
     try:
-        # Load existing alerts
-        if alerts_path.exists():
-            with alerts_path.open('r', encoding='utf-8') as f:
-                data = json.load(f)
-        else:
-            data = {"timestamp": "", "alerts": []}
-        
-        # Create new alert
-        new_alert = {
-            "level": level,
-            "metric": metric,
-            "message": message,
-            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-        }
-        
-        if value is not None:
-            new_alert["value"] = value
-        if threshold is not None:
-            new_alert["threshold"] = threshold
-        
-        # Add to alerts list
-        data["alerts"].append(new_alert)
-        data["timestamp"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-        
-        # Write back to file
-        with alerts_path.open('w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
-        
-        logger.info(f"Added {level} alert for {metric}: {message}")
-        return True
+        with _pending_lock:
+            # Create new alert
+            new_alert = _intern_fields({
+                "level": level,
+                "metric": metric,
+                "message": message,
+                "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            })
+            
+            index = _get_dedup_index(alerts_path)
+            if is_duplicate_alert(index, new_alert):
+                logger.debug(f"Skipping repeated {level} alert for {metric}: {message}")
+                return True
+            
+            if value is not None:
+                new_alert["value"] = value
+            if threshold is not None:
+                new_alert["threshold"] = threshold
+            
+            queued = _pending.setdefault(cache_key, [])
+            if not queued:
+                _arm_flush_timer(cache_key)
+            queued.append(new_alert)
+            index[_alert_key(new_alert)] = new_alert["timestamp"]
+            
+            logger.info(f"Added {level} alert for {metric}: {message}")
+            
+            if len(queued) >= _FLUSH_THRESHOLD:
+                return _flush_pending(cache_key)
+            return True
         
     except Exception as e:
         logger.error(f"Error adding alert: {e}")
@@ -226,7 +717,14 @@ def clear_alerts(path: str = DEFAULT_ALERTS_PATH) -> bool:
         >>> clear_alerts()
         True
     """
-    return create_empty_alerts_file(path)
+    with _pending_lock:
+        # Queued alerts are part of what is being cleared
+        cache_key = str(Path(path))
+        _pending.pop(cache_key, None)
+        _cancel_flush_timer(cache_key)
+        with _metric_cache_lock:
+            _metric_cache.pop(cache_key, None)
+        return create_empty_alerts_file(path)
 
 
 def get_alert_counts(alerts: List[Dict[str, Any]]) -> Dict[str, int]:
@@ -244,14 +742,19 @@ def get_alert_counts(alerts: List[Dict[str, Any]]) -> Dict[str, int]:
         >>> print(counts)
         {'info': 2, 'warning': 5, 'critical': 1}
     """
-    counts = {'info': 0, 'warning': 0, 'critical': 0}
-    
-    for alert in alerts:
-        level = alert.get('level', 'info')
-        if level in counts:
-            counts[level] += 1
+    # Alerts without a level count as info
+    counts = Counter(alert.get('level', 'info') for alert in alerts)
+    return {level: counts[level] for level in ('info', 'warning', 'critical')}
+
+
+def _timestamp_key(alert: Dict[str, Any]) -> str:
+    """
+    Sort key for alerts by time, with fallback for missing timestamps.
     
-    return counts
+    Timestamps are fixed-width UTC ISO-8601 strings, so they order
+    correctly as plain strings without being parsed.
+    """
+    return alert.get('timestamp', '1970-01-01T00:00:00Z')
 
 
 def _sort_alerts_by_timestamp(alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -264,17 +767,64 @@ def _sort_alerts_by_timestamp(alerts: List[Dict[str, Any]]) -> List[Dict[str, An
     Returns:
         list: Sorted alerts
     """
-    def get_timestamp(alert: Dict[str, Any]) -> str:
-        """Get timestamp for sorting, with fallback."""
-        return alert.get('timestamp', '1970-01-01T00:00:00Z')
-    
     try:
-        return sorted(alerts, key=get_timestamp, reverse=True)
+        return sorted(alerts, key=_timestamp_key, reverse=True)
     except Exception as e:
         logger.warning(f"Error sorting alerts: {e}. Returning unsorted.")
         return alerts
 
 
+def sort_alerts_by_severity(alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Sort alerts by severity (critical, warning, info), keeping input order within a level.
+    
+    With only three levels this is a single bucketing pass rather than a
+    comparison sort. Alerts with an unknown level go last.
+    
+    Args:
+        alerts: List of alert dictionaries
+        
+    Returns:
+        list: Alerts ordered by severity, most severe first
+        
+    Example:
+        >>> by_severity = sort_alerts_by_severity(load_alerts())
+    """
+    buckets: Dict[Any, List[Dict[str, Any]]] = {level: [] for level in reversed(ALERT_LEVELS)}
+    unknown = []
+    
+    for alert in alerts:
+        bucket = buckets.get(alert.get('level'))
+        if bucket is None:
+            unknown.append(alert)
+        else:
+            bucket.append(alert)
+    
+    result = []
+    for bucket in buckets.values():
+        result.extend(bucket)
+    result.extend(unknown)
+    return result
+
+
+def _latest_alerts(alerts: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """
+    Get the newest alerts, newest first, without sorting the whole list.
+    
+    Args:
+        alerts: List of alert dictionaries
+        limit: Number of alerts to return
+        
+    Returns:
+        list: Up to limit alerts, same order as sorting then slicing
+    """
+    try:
+        return nlargest(limit, alerts, key=_timestamp_key)
+    except Exception as e:
+        logger.warning(f"Error sorting alerts: {e}. Returning unsorted.")
+        return alerts[:limit]
+
+
 def filter_alerts_by_metric(
     alerts: List[Dict[str, Any]],
     metric: str
@@ -295,6 +845,169 @@ def filter_alerts_by_metric(
     return [a for a in alerts if a.get('metric') == metric]
 
 
+def _metric_entry(
+    path: str
+) -> Optional[Tuple[Tuple[int, int], Dict[Any, Tuple[Dict[str, Any], ...]], Dict[str, Any]]]:
+    """
+    Return the cached metric grouping for the current version of a file.
+    
+    The alerts are grouped by metric in a single pass the first time a
+    version is seen. Callers flush queued alerts first.
+    
+    Returns:
+        tuple or None: (file_key, groups, series) or None if the file
+                       cannot be statted
+    """
+    cache_key = str(Path(path))
+    try:
+        # Taken before the read, so a concurrent write can only make the
+        # entry look older than its contents
+        file_key = _file_key(Path(path))
+    except OSError:
+        return None
+    with _metric_cache_lock:
+        entry = _metric_cache.get(cache_key)
+    if entry is not None and entry[0] == file_key:
+        return entry
+    
+    # Built outside the lock; load_alerts takes _pending_lock to flush
+    groups: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
+    for alert in load_alerts(path):
+        groups[alert.get('metric')].append(alert)
+    entry = (file_key, {metric: tuple(alerts) for metric, alerts in groups.items()}, {})
+    with _metric_cache_lock:
+        _metric_cache[cache_key] = entry
+    return entry
+
+
+def get_alerts_by_metric(
+    metric: str,
+    path: str = DEFAULT_ALERTS_PATH
+) -> List[Dict[str, Any]]:
+    """
+    Get the stored alerts for one metric type.
+    
+    The file is grouped by metric once per version, so repeated lookups
+    for any metric are a dict lookup until the file changes.
+    
+    Args:
+        metric: Metric type (cpu, memory, disk, etc.)
+        path: Path to alerts.json file
+        
+    Returns:
+        list: Alerts for metric sorted by timestamp (newest first); the
+              alert dicts are shared with the cache, copy before mutating
+        
+    Example:
+        >>> cpu_alerts = get_alerts_by_metric('cpu')
+    """
+    # Queued alerts must reach the file before its key is taken
+    flush_alerts(path)
+    
+    entry = _metric_entry(path)
+    if entry is None:
+        return filter_alerts_by_metric(load_alerts(path), metric)
+    
+    return list(entry[1].get(metric, ()))
+
+
+def _metric_series(
+    path: str,
+    metric: str
+) -> Optional[Tuple[Tuple[str, ...], Tuple[Any, ...]]]:
+    """
+    Timestamps (oldest first) and values of one metric's alerts, for the
+    current file version, or None if the file cannot be statted.
+    """
+    entry = _metric_entry(path)
+    if entry is None:
+        return None
+    series = entry[2]
+    if metric not in series:
+        # The grouping is newest first; walk it backwards for ascending timestamps
+        ordered = entry[1].get(metric, ())[::-1]
+        series[metric] = (
+            tuple(_timestamp_key(a) for a in ordered),
+            tuple(a.get('value') for a in ordered)
+        )
+    return series[metric]
+
+
+def is_sustained(
+    metric: str,
+    window_s: float,
+    threshold: float,
+    path: str = DEFAULT_ALERTS_PATH
+) -> bool:
+    """
+    Check whether every alert for a metric in a recent window exceeds a threshold.
+    
+    The window ends at the metric's newest alert. Timestamps are kept
+    sorted, so the start of the window is found by binary search and
+    only the alerts inside it are checked.
+    
+    Args:
+        metric: Metric type (cpu, memory, disk, etc.)
+        window_s: Window length in seconds
+        threshold: Value every alert in the window must exceed
+        path: Path to alerts.json file
+        
+    Returns:
+        bool: True if the window has alerts and all of their values exceed
+              threshold, False otherwise
+        
+    Example:
+        >>> is_sustained('cpu', 300, 80.0)
+        False
+    """
+    flush_alerts(path)
+    
+    series = _metric_series(path, metric)
+    if series is None:
+        return False
+    
+    timestamps, values = series
+    if not timestamps:
+        return False
+    
+    try:
+        newest = datetime.strptime(timestamps[-1], "%Y-%m-%dT%H:%M:%SZ")
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Unsupported alert timestamp {timestamps[-1]!r}: {e}")
+        return False
+    
+    # Same fixed-width format as the stored timestamps, so it compares as a string
+    cutoff = (newest - timedelta(seconds=window_s)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    start = bisect_left(timestamps, cutoff)
+    
+    return all(
+        isinstance(v, (int, float)) and v > threshold
+        for v in values[start:]
+    )
+
+
+def filter_alerts_by_metric_from_file(
+    path: str,
+    metric: str
+) -> List[Dict[str, Any]]:
+    """
+    Load alerts for one metric type, cached until the file changes.
+    
+    Same as get_alerts_by_metric(metric, path), with the file first.
+    
+    Args:
+        path: Path to alerts.json file
+        metric: Metric type to filter by (cpu, memory, disk, etc.)
+        
+    Returns:
+        list: Alerts for metric sorted by timestamp (newest first)
+        
+    Example:
+        >>> cpu_alerts = filter_alerts_by_metric_from_file(DEFAULT_ALERTS_PATH, 'cpu')
+    """
+    return get_alerts_by_metric(metric, path)
+
+
 def get_latest_alert(alerts: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     """
     Get the most recent alert.
@@ -311,5 +1024,9 @@ def get_latest_alert(alerts: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     if not alerts:
         return None
     
-    sorted_alerts = _sort_alerts_by_timestamp(alerts)
-    return sorted_alerts[0] if sorted_alerts else None
+    # Single pass; no need to sort everything for one item
+    try:
+        return max(alerts, key=_timestamp_key)
+    except Exception as e:
+        logger.warning(f"Error comparing alert timestamps: {e}. Returning first alert.")
+        return alerts[0]
@@ -53,9 +53,9 @@ def load_current_metrics(path: str = DEFAULT_METRICS_PATH) -> Dict[str, Any]:
             logger.warning(f"Metrics file not found: {metrics_path}")
             return _get_empty_metrics()
         
-        # Use utf-8-sig to handle BOM (Byte Order Mark) from PowerShell scripts
-        with metrics_path.open('r', encoding='utf-8-sig') as f:
-            raw_data = json.load(f)
+        # Read once and parse the bytes; json.loads detects the UTF-8 BOM
+        # (Byte Order Mark) that PowerShell scripts write
+        raw_data = json.loads(metrics_path.read_bytes())
         
         # Parse and structure the metrics
         parsed_metrics = _parse_metrics(raw_data)
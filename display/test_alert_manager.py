@@ -0,0 +1,160 @@
+"""Tests for core.alert_manager's JSON Lines storage and write-behind queue."""
+
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core import alert_manager
+
+
+def _ts(seconds_ago=0):
+    """UTC timestamp in the stored format, seconds_ago in the past."""
+    when = datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)
+    return when.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _alert(metric, level='warning', message='high', timestamp=None):
+    return {
+        'level': level,
+        'metric': metric,
+        'message': message,
+        'timestamp': timestamp or _ts(),
+    }
+
+
+def _write_jsonl(path, header_alerts=(), lines=()):
+    header = {'timestamp': _ts(), 'alerts': list(header_alerts)}
+    text = ''.join(json.dumps(obj) + '\n' for obj in [header, *lines])
+    path.write_text(text)
+
+
+def _file_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+@pytest.fixture
+def alerts_path(tmp_path):
+    path = tmp_path / 'alerts.json'
+    yield path
+    # Don't leave queued alerts or timers behind for the next test
+    alert_manager.clear_alerts(str(path))
+
+
+def test_old_single_document_is_read_and_converted(alerts_path):
+    old = [
+        _alert('cpu', timestamp='2025-01-01T00:00:02Z'),
+        _alert('memory', timestamp='2025-01-01T00:00:01Z'),
+    ]
+    alerts_path.write_text(json.dumps({'timestamp': _ts(), 'alerts': old}, indent=2))
+
+    assert [a['metric'] for a in alert_manager.load_alerts(str(alerts_path))] == ['cpu', 'memory']
+
+    assert alert_manager.add_alert('disk', 'critical', 'full', path=str(alerts_path))
+    assert alert_manager.flush_alerts(str(alerts_path))
+
+    header, *lines = _file_lines(alerts_path)
+    assert header['alerts'] == []
+    # Converted oldest first, with the new alert appended after them
+    assert [a['metric'] for a in lines] == ['memory', 'cpu', 'disk']
+
+
+def test_header_alerts_are_combined_with_appended_lines(alerts_path):
+    _write_jsonl(
+        alerts_path,
+        header_alerts=[_alert('cpu', timestamp='2025-01-01T00:00:00Z')],
+        lines=[
+            _alert('memory', timestamp='2025-01-01T00:00:01Z'),
+            _alert('disk', timestamp='2025-01-01T00:00:02Z'),
+        ],
+    )
+
+    path = str(alerts_path)
+    assert [a['metric'] for a in alert_manager.load_alerts(path)] == ['disk', 'memory', 'cpu']
+    # A limit larger than the appended lines reaches into the header
+    assert [a['metric'] for a in alert_manager.load_alerts(path, limit=3)] == ['disk', 'memory', 'cpu']
+
+
+def test_truncated_last_line_is_skipped(alerts_path):
+    _write_jsonl(alerts_path, lines=[_alert('cpu'), _alert('memory')])
+    with alerts_path.open('a') as f:
+        f.write('{"level": "warning", "metr')
+
+    path = str(alerts_path)
+    assert {a['metric'] for a in alert_manager.load_alerts(path)} == {'cpu', 'memory'}
+    assert {a['metric'] for a in alert_manager.load_alerts(path, limit=5)} == {'cpu', 'memory'}
+
+    # The next append starts on a fresh line rather than extending the fragment
+    assert alert_manager.add_alert('disk', 'info', 'ok', path=path)
+    assert alert_manager.flush_alerts(path)
+    assert {a['metric'] for a in alert_manager.load_alerts(path)} == {'cpu', 'memory', 'disk'}
+
+
+@pytest.mark.parametrize('level_filter', [None, 'warning'])
+@pytest.mark.parametrize('limit', [1, 2, 5, 50])
+def test_limit_matches_full_load(alerts_path, level_filter, limit):
+    levels = ['warning', 'info', 'critical']
+    lines = [
+        # Several alerts share each second, as bursts of adds do
+        _alert(f'm{i}', level=levels[i % 3], timestamp=f'2025-01-01T00:00:{i // 4:02d}Z')
+        for i in range(20)
+    ]
+    _write_jsonl(alerts_path, header_alerts=[_alert('h', timestamp='2024-12-31T00:00:00Z')], lines=lines)
+
+    path = str(alerts_path)
+    full = alert_manager.load_alerts(path, level_filter=level_filter)
+    assert alert_manager.load_alerts(path, level_filter=level_filter, limit=limit) == full[:limit]
+
+
+def test_alerts_flush_once_threshold_is_reached(alerts_path, monkeypatch):
+    monkeypatch.setattr(alert_manager, '_FLUSH_INTERVAL', 60.0)
+    path = str(alerts_path)
+
+    for i in range(alert_manager._FLUSH_THRESHOLD - 1):
+        assert alert_manager.add_alert(f'm{i}', 'info', 'queued', path=path)
+    assert not alerts_path.exists()
+
+    assert alert_manager.add_alert('last', 'info', 'queued', path=path)
+    assert len(_file_lines(alerts_path)) == 1 + alert_manager._FLUSH_THRESHOLD
+
+
+def test_alerts_flush_on_timer(alerts_path, monkeypatch):
+    monkeypatch.setattr(alert_manager, '_FLUSH_INTERVAL', 0.05)
+
+    assert alert_manager.add_alert('cpu', 'warning', 'high', path=str(alerts_path))
+
+    deadline = time.monotonic() + 2.0
+    while not alerts_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert [a['metric'] for a in _file_lines(alerts_path)[1:]] == ['cpu']
+
+
+def test_repeat_is_skipped_only_within_dedup_window(alerts_path):
+    path = str(alerts_path)
+    window = alert_manager._DEDUP_WINDOW.total_seconds()
+    _write_jsonl(alerts_path, lines=[_alert('cpu', message='high', timestamp=_ts(window + 60))])
+
+    # Last seen outside the window: recorded again
+    assert alert_manager.add_alert('cpu', 'warning', 'high', path=path)
+    # Now seen within the window: skipped
+    assert alert_manager.add_alert('cpu', 'warning', 'high', path=path)
+    # A different level is a different condition
+    assert alert_manager.add_alert('cpu', 'critical', 'high', path=path)
+
+    alerts = alert_manager.load_alerts(path)
+    assert [(a['level'], a['message']) for a in alerts].count(('warning', 'high')) == 2
+    assert len(alerts) == 3
+
+
+def test_non_string_timestamp_does_not_block_adds(alerts_path):
+    _write_jsonl(alerts_path, lines=[
+        {'level': 'info', 'metric': 'cpu', 'message': 'a', 'timestamp': None},
+        {'level': 'info', 'metric': 'cpu', 'message': 'b', 'timestamp': 1700000000},
+    ])
+
+    path = str(alerts_path)
+    assert alert_manager.add_alert('cpu', 'info', 'a', path=path)
+    assert alert_manager.add_alert('memory', 'info', 'c', path=path)
+    assert alert_manager.flush_alerts(path)
+    assert len(_file_lines(alerts_path)) == 5
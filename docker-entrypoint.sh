@@ -51,13 +51,18 @@ echo "📟 Terminal Dashboard:"
 echo "   Run inside container: docker exec -it system-monitor-dashboard python3 dashboard_tui.py"
 echo ""
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-echo "✓ Starting Flask Application..."
+echo "✓ Starting Flask Application (gunicorn)..."
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
 echo ""
 
-# If command is provided, execute it; otherwise start Flask
+# If command is provided, execute it; otherwise start Flask under gunicorn
 if [ $# -eq 0 ]; then
-    exec python3 -m flask --app web.app run --host 0.0.0.0 --port 5000
+    exec gunicorn \
+        --workers "${WEB_WORKERS:-4}" \
+        --worker-class "${WEB_WORKER_CLASS:-gthread}" \
+        --threads "${WEB_THREADS:-4}" \
+        --bind 0.0.0.0:5000 \
+        web.app:app
 else
     exec "$@"
 fi
@@ -5,24 +5,27 @@ Serves the modern cyber-aesthetic dashboard and creates a strict data pipeline
 from Host/output/latest.json to the frontend.
 """
 
-import sys
+import re
 import json
 import logging
 from pathlib import Path
-from flask import Flask, render_template, jsonify, send_file, request
+from flask import Flask, render_template, jsonify, send_from_directory, request, abort
+from flask.json.provider import JSONProvider
 from datetime import datetime
 import os
+import threading
 import requests
-
-# Ensure 'web' directory is in path for imports regardless of run context
-current_dir = Path(__file__).parent
-if str(current_dir) not in sys.path:
-    sys.path.append(str(current_dir))
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 
 try:
-    from report_generator import ReportGenerator
-except ImportError:
-    from web.report_generator import ReportGenerator
+    import orjson
+except ImportError:  # Optional; fall back to the stdlib parser
+    orjson = None
+
+# Imported as the 'web' package (gunicorn web.app:app, dashboard_web.py,
+# python -m web.app), so the project root - and with it 'core' - is on sys.path
+from .report_generator import ReportGenerator
 
 # Configuration
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -39,6 +42,14 @@ ALERTS_FILE = DATA_DIR / 'alerts' / 'alerts.json'
 NATIVE_AGENT_URL = os.getenv('NATIVE_AGENT_URL', 'http://host.docker.internal:8889')
 USE_NATIVE_AGENT = os.getenv('USE_NATIVE_AGENT', 'false').lower() == 'true'
 
+# Report files generate_report() writes, e.g. report_20251205_103000.html
+REPORT_HTML_NAME = re.compile(r'report_[0-9_]+\.html')
+
+# Production server (gunicorn) configuration
+WEB_WORKERS = int(os.getenv('WEB_WORKERS', '4'))
+WEB_THREADS = int(os.getenv('WEB_THREADS', '4'))
+WEB_WORKER_CLASS = os.getenv('WEB_WORKER_CLASS', 'gthread')  # or 'gevent' for many idle clients
+
 # Initialize Report Generator
 report_gen = ReportGenerator(HOST_LATEST_JSON, ALERTS_FILE, REPORTS_DIR)
 
@@ -49,9 +60,130 @@ logging.basicConfig(
 )
 logger = logging.getLogger('dashboard-v5')
 
+def _load_json(path):
+    """Read and parse a JSON file, using orjson when it is installed."""
+    raw = Path(path).read_bytes()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+# Parsed metrics files keyed by path, tagged with (mtime_ns, size). The
+# host rewrites these every few seconds while dashboards poll far more
+# often, so most requests reuse the last parse.
+_PARSE_CACHE = {}
+_PARSE_CACHE_MAX = 8  # archive fallbacks add a new path each time the newest log changes
+_PARSE_CACHE_LOCK = threading.Lock()
+
+def _load_cached(path):
+    """Parse a JSON file, reusing the previous result until the file changes.
+
+    The returned object is shared between requests and must not be mutated.
+    """
+    path = Path(path)
+    st = path.stat()
+    key = (st.st_mtime_ns, st.st_size)
+    with _PARSE_CACHE_LOCK:
+        hit = _PARSE_CACHE.get(path)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    # Parse outside the lock so the legacy and native loads run in parallel.
+    # Entries are tagged with the stat taken before the read, so storing a
+    # result that a concurrent writer already superseded only costs a reparse.
+    data = _load_json(path)
+    with _PARSE_CACHE_LOCK:
+        hit = _PARSE_CACHE.get(path)
+        if hit is not None and hit[0] == key:
+            # Another thread parsed the same version meanwhile; share its result
+            return hit[1]
+        _PARSE_CACHE.pop(path, None)
+        if len(_PARSE_CACHE) >= _PARSE_CACHE_MAX:
+            # Dicts keep insertion order; drop the least recently parsed file
+            del _PARSE_CACHE[next(iter(_PARSE_CACHE))]
+        _PARSE_CACHE[path] = (key, data)
+        return data
+
+# Newest archive log in json/, tagged with the directory's mtime_ns. The
+# JSON logger adds a new file per sample, which bumps the directory mtime.
+_ARCHIVE_CACHE = (None, None)
+
+def _newest_archive():
+    """Most recently modified *.json in json/, or None; rescans only when the directory changes."""
+    global _ARCHIVE_CACHE
+    try:
+        dir_key = JSON_DIR.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached_key, cached_path = _ARCHIVE_CACHE
+    if cached_key == dir_key:
+        return cached_path
+    # Single pass; no need to sort the whole archive for the newest file
+    newest = max(JSON_DIR.glob('*.json'), key=lambda p: p.stat().st_mtime, default=None)
+    _ARCHIVE_CACHE = (dir_key, newest)
+    return newest
+
+# Shared HTTP session so calls to the native agent and host API reuse
+# keep-alive connections instead of opening a socket per request
+_SESSION = requests.Session()
+_SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# Background I/O (native agent file/API) overlapped with request work
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='dashboard-io')
+
+def _read_legacy():
+    """Legacy (Bash) metrics from Host/output/latest.json, or None."""
+    if HOST_LATEST_JSON.exists():
+        try:
+            return _load_cached(HOST_LATEST_JSON)
+        except: pass
+    return None
+
+def _fetch_native():
+    """Native (Go) metrics from go_latest.json (preferred for speed), else the agent API.
+
+    Returns (data, source) where source is 'file', 'api' or None.
+    """
+    if GO_LATEST_JSON.exists():
+        try:
+            native_data = _load_cached(GO_LATEST_JSON)
+            if native_data:
+                return native_data, 'file'
+        except: pass
+    try:
+        response = _SESSION.get(f"{NATIVE_AGENT_URL}/metrics", timeout=1)
+        if response.status_code == 200:
+            return response.json(), 'api'
+    except: pass
+    return None, None
+
+def _file_version(path):
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = Path(path).stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson; jsonify() writes orjson bytes straight into the response."""
+
+    # Int dict keys are accepted, as with the stdlib encoder
+    OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.OPTIONS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=self.OPTIONS), mimetype='application/json')
+
 app = Flask(__name__,
             template_folder=str(PROJECT_ROOT / 'templates'),
             static_folder=str(PROJECT_ROOT / 'static'))
+if orjson is not None:
+    app.json = ORJSONProvider(app)
 
 @app.route('/')
 def index():
@@ -70,8 +202,7 @@ def get_metrics():
     # 1. Try Host Output (Preferred)
     if HOST_LATEST_JSON.exists():
         try:
-            with open(HOST_LATEST_JSON, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = _load_cached(HOST_LATEST_JSON)
             return jsonify({
                 'success': True,
                 'source': 'host_direct',
@@ -83,19 +214,16 @@ def get_metrics():
 
     # 2. Try Latest Log in json/ directory
     try:
-        if JSON_DIR.exists():
-            json_files = sorted(JSON_DIR.glob('*.json'), key=lambda p: p.stat().st_mtime, reverse=True)
-            if json_files:
-                latest_log = json_files[0]
-                with open(latest_log, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                return jsonify({
-                    'success': True,
-                    'source': 'archive_log',
-                    'timestamp': datetime.now().isoformat(),
-                    'file': latest_log.name,
-                    'data': data
-                })
+        latest_log = _newest_archive()
+        if latest_log:
+            data = _load_cached(latest_log)
+            return jsonify({
+                'success': True,
+                'source': 'archive_log',
+                'timestamp': datetime.now().isoformat(),
+                'file': latest_log.name,
+                'data': data
+            })
     except Exception as e:
         logger.error(f"Failed to read archive json: {e}")
 
@@ -115,7 +243,7 @@ def get_native_metrics():
     """
     # 1. Try Live API
     try:
-        response = requests.get(f"{NATIVE_AGENT_URL}/metrics", timeout=2)
+        response = _SESSION.get(f"{NATIVE_AGENT_URL}/metrics", timeout=2)
         if response.status_code == 200:
             return jsonify({
                 'success': True,
@@ -129,8 +257,7 @@ def get_native_metrics():
     # 2. Try File Fallback
     if GO_LATEST_JSON.exists():
         try:
-            with open(GO_LATEST_JSON, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = _load_cached(GO_LATEST_JSON)
             return jsonify({
                 'success': True,
                 'source': 'native_agent_file',
@@ -150,30 +277,10 @@ def get_dual_metrics():
     """
     Returns BOTH Legacy (Bash) and Native (Go) metrics for side-by-side comparison.
     """
-    legacy_data = None
-    native_data = None
-
-    # Get Legacy
-    if HOST_LATEST_JSON.exists():
-        try:
-            with open(HOST_LATEST_JSON, 'r', encoding='utf-8') as f:
-                legacy_data = json.load(f)
-        except: pass
-
-    # Get Native (File preferred for speed, else API)
-    if GO_LATEST_JSON.exists():
-        try:
-            with open(GO_LATEST_JSON, 'r', encoding='utf-8') as f:
-                native_data = json.load(f)
-        except: pass
-    
-    # If native file missing, try API
-    if not native_data:
-        try:
-            response = requests.get(f"{NATIVE_AGENT_URL}/metrics", timeout=1)
-            if response.status_code == 200:
-                native_data = response.json()
-        except: pass
+    # Native may wait on the agent API; read legacy while it runs
+    native_future = _EXECUTOR.submit(_fetch_native)
+    legacy_data = _read_legacy()
+    native_data, _ = native_future.result()
 
     return jsonify({
         'success': True,
@@ -196,50 +303,43 @@ def get_metrics_source():
 def generate_report():
     """Generate a system report on demand."""
     try:
-        # Fetch Dual Metrics (similar to get_dual_metrics)
-        legacy_data = None
-        native_data = None
+        # Input versions, taken before any read is dispatched so a concurrent
+        # write can only make the key older than the data (forcing a fresh
+        # report next time)
+        source_key = [_file_version(HOST_LATEST_JSON), _file_version(GO_LATEST_JSON), _file_version(ALERTS_FILE)]
+
+        # Fetch Dual Metrics (same as get_dual_metrics); native metrics and
+        # alerts load in the background while legacy is read here
+        native_future = _EXECUTOR.submit(_fetch_native)
+        alerts_future = _EXECUTOR.submit(report_gen.get_alerts)
 
         # 1. Get Legacy
-        if HOST_LATEST_JSON.exists():
-            try:
-                with open(HOST_LATEST_JSON, 'r', encoding='utf-8') as f:
-                    legacy_data = json.load(f)
-            except: pass
+        legacy_data = _read_legacy()
         
         # Fallback for Legacy if missing
-        if not legacy_data and JSON_DIR.exists():
+        if not legacy_data:
             try:
-                json_files = sorted(JSON_DIR.glob('*.json'), key=lambda p: p.stat().st_mtime, reverse=True)
-                if json_files:
-                    with open(json_files[0], 'r', encoding='utf-8') as f:
-                        legacy_data = json.load(f)
+                latest_log = _newest_archive()
+                if latest_log:
+                    source_key.append((latest_log.name, _file_version(latest_log)))
+                    legacy_data = _load_cached(latest_log)
             except: pass
 
         # 2. Get Native
-        if GO_LATEST_JSON.exists():
-            try:
-                with open(GO_LATEST_JSON, 'r', encoding='utf-8') as f:
-                    native_data = json.load(f)
-            except: pass
-        
-        if not native_data:
-            try:
-                response = requests.get(f"{NATIVE_AGENT_URL}/metrics", timeout=1)
-                if response.status_code == 200:
-                    native_data = response.json()
-            except: pass
+        native_data, native_source = native_future.result()
 
         if not legacy_data and not native_data:
              return jsonify({'success': False, 'error': 'No metrics available to generate report'})
         
-        # Determine alerts (mock or load real)
-        alerts_data = []
-        if ALERTS_FILE.exists():
-            with open(ALERTS_FILE, 'r', encoding='utf-8') as f:
-                alerts_data = json.load(f)
-
-        html_path, md_path = report_gen.generate_report(legacy_data, native_data, alerts_data)
+        # Alerts and their level counts, cached by the generator until alerts.json changes
+        alerts_data, alert_counts = alerts_future.result()
+
+        # Live API data has no file version, so those reports are never reused
+        html_path, md_path = report_gen.generate_report(
+            legacy_data, native_data, alerts_data,
+            alert_counts=alert_counts,
+            source_key=tuple(source_key) if native_source != 'api' else None
+        )
         
         return jsonify({
             'success': True, 
@@ -255,7 +355,11 @@ def generate_report():
 @app.route('/api/reports/download/html/<filename>')
 def download_report_html(filename):
     """Download HTML report."""
-    return send_file(REPORTS_DIR / 'html' / filename, as_attachment=True)
+    # Only names generate_report() produces; rejects traversal before touching the disk
+    if not REPORT_HTML_NAME.fullmatch(filename):
+        abort(404)
+    # Conditional: repeat downloads get 304 via ETag / Last-Modified, and Range is honoured
+    return send_from_directory(REPORTS_DIR / 'html', filename, as_attachment=True, conditional=True, etag=True)
 
 
 @app.route('/api/refresh', methods=['POST'])
@@ -268,7 +372,7 @@ def trigger_refresh():
     # 1. Refresh Legacy Host (if URL available)
     host_api_url = os.getenv('HOST_API_URL', 'http://host.docker.internal:8888')
     try:
-        resp = requests.post(f"{host_api_url}/refresh", timeout=12)
+        resp = _SESSION.post(f"{host_api_url}/refresh", timeout=12)
         results['legacy'] = resp.json() if resp.status_code == 200 else {'error': resp.text}
     except Exception as e:
         results['legacy'] = {'error': str(e)}
@@ -277,7 +381,7 @@ def trigger_refresh():
     if os.getenv('USE_NATIVE_AGENT', 'false').lower() == 'true' or True: # Try anyway
         native_url = os.getenv('NATIVE_AGENT_URL', 'http://host.docker.internal:8889')
         try:
-            resp = requests.post(f"{native_url}/refresh", timeout=5)
+            resp = _SESSION.post(f"{native_url}/refresh", timeout=5)
             results['native'] = resp.json() if resp.status_code == 200 else {'error': resp.text}
         except Exception as e:
             results['native'] = {'error': str(e)}
@@ -294,13 +398,39 @@ def health_check():
     return jsonify({'status': 'healthy', 'version': '5.0'})
 
 def run_server(host='0.0.0.0', port=5000, debug=False):
-    """Start the Flask server."""
+    """Start the web server.
+
+    Runs under gunicorn (several worker processes, threaded) when it is
+    installed. Debug mode, and platforms without gunicorn such as Windows,
+    use Flask's built-in server.
+    """
     print(f"🚀 System Monitor v5.0 Starting...")
     print(f"📂 Project Root: {PROJECT_ROOT}")
     print(f"📡 Metrics Source: {HOST_LATEST_JSON}")
     print(f"🌍 Server: http://{host}:{port}")
     
-    app.run(host=host, port=port, debug=debug)
+    if not debug:
+        try:
+            from gunicorn.app.base import BaseApplication
+        except ImportError:
+            BaseApplication = None
+
+        if BaseApplication is not None:
+            class DashboardServer(BaseApplication):
+                def load_config(self):
+                    self.cfg.set('bind', f'{host}:{port}')
+                    self.cfg.set('workers', WEB_WORKERS)
+                    self.cfg.set('worker_class', WEB_WORKER_CLASS)
+                    self.cfg.set('threads', WEB_THREADS)
+
+                def load(self):
+                    return app
+
+            print(f"⚙️  Workers: {WEB_WORKERS} x {WEB_THREADS} threads ({WEB_WORKER_CLASS})")
+            DashboardServer().run()
+            return
+
+    app.run(host=host, port=port, debug=debug, threaded=True)
 
 if __name__ == '__main__':
     run_server()
@@ -1,10 +1,26 @@
 #!/usr/bin/env python3
 """Report generation module for system monitoring"""
 
+from bisect import bisect_right
+from collections import Counter, OrderedDict
 from pathlib import Path
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
 import os
+import threading
+
+from core.alert_manager import flush_alerts, load_alerts
+
+
+# Byte units, one per power of 1024
+BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# Percentage bands: below 60 success, 60-80 warning, 80 and above danger
+PCT_THRESHOLDS = (60, 80)
+PCT_CLASSES = ('success', 'warning', 'danger')
+
+# Number of (source_key -> report paths) entries kept for reuse
+REPORT_MEMO_SIZE = 16
 
 
 class ReportGenerator:
@@ -28,11 +44,22 @@ class ReportGenerator:
         self.html_dir.mkdir(parents=True, exist_ok=True)
         self.markdown_dir.mkdir(parents=True, exist_ok=True)
         
+        # (file version, alerts, counts) for alerts_file; see get_alerts()
+        self._alerts_cache = (None, [], self._count_alerts_by_level([]))
+        self._alerts_lock = threading.Lock()
+        
+        # Reports already generated per source_key, least recently used first
+        self._report_memo = OrderedDict()
+        self._report_memo_lock = threading.Lock()
+        
         # Setup Jinja2 environment
         template_dir = Path(__file__).parent.parent / 'templates'
+        # Compiled templates are cached on disk (per-user temp dir), so new
+        # worker processes skip recompiling them
         self.env = Environment(
             loader=FileSystemLoader(str(template_dir)),
-            autoescape=select_autoescape(['html', 'xml'])
+            autoescape=select_autoescape(['html', 'xml']),
+            bytecode_cache=FileSystemBytecodeCache()
         )
         
         # Add custom filters
@@ -40,18 +67,23 @@ class ReportGenerator:
         self.env.filters['format_timestamp'] = self._format_timestamp
         self.env.filters['percentage_color'] = self._percentage_color
         self.env.filters['alert_level_badge'] = self._alert_level_badge
+        
+        # Load templates once; filters must be registered first
+        self.html_template = self.env.get_template('report_template.html')
+        self.md_template = self.env.get_template('report_template.md')
     
     def _format_bytes(self, bytes_value, unit='auto'):
         """Format bytes to human readable format"""
         try:
-            bytes_value = float(bytes_value)
+            if type(bytes_value) is not float:
+                bytes_value = float(bytes_value)
             if unit == 'auto':
-                for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-                    if bytes_value < 1024.0:
-                        return f"{bytes_value:.2f} {unit}"
-                    bytes_value /= 1024.0
+                # Unit index straight from the bit length: each unit is 10 bits
+                whole = int(bytes_value) if bytes_value > 0 else 0
+                idx = min(len(BYTE_UNITS) - 1, max(0, (whole.bit_length() - 1) // 10))
+                return f"{bytes_value / (1 << (10 * idx)):.2f} {BYTE_UNITS[idx]}"
             return f"{bytes_value:.2f} {unit}"
-        except (ValueError, TypeError):
+        except (ValueError, TypeError, OverflowError):
             return "N/A"
     
     def _format_timestamp(self, timestamp_str):
@@ -65,13 +97,8 @@ class ReportGenerator:
     def _percentage_color(self, percentage):
         """Get color class based on percentage"""
         try:
-            pct = float(percentage)
-            if pct >= 80:
-                return 'danger'
-            elif pct >= 60:
-                return 'warning'
-            else:
-                return 'success'
+            pct = percentage if type(percentage) is float else float(percentage)
+            return PCT_CLASSES[bisect_right(PCT_THRESHOLDS, pct)]
         except (ValueError, TypeError):
             return 'secondary'
     
@@ -84,46 +111,102 @@ class ReportGenerator:
         }
         return level_map.get(level.lower(), 'secondary')
     
-    def generate_report(self, legacy_metrics, native_metrics, alerts):
+    def get_alerts(self):
+        """Load alerts from alerts_file along with their counts by level
+        
+        Both are cached until the file's mtime or size changes, so repeated
+        reports neither re-read the file nor re-count the alerts.
+        
+        Returns:
+            Tuple of (alerts, alert_counts); treat both as read-only
+        """
+        with self._alerts_lock:
+            # Alerts queued in this process must reach the file before it is stat'ed
+            flush_alerts(str(self.alerts_file))
+            try:
+                st = self.alerts_file.stat()
+            except OSError:
+                return [], self._count_alerts_by_level([])
+            version = (st.st_mtime_ns, st.st_size)
+            
+            cached_version, alerts, counts = self._alerts_cache
+            if cached_version != version:
+                alerts = load_alerts(str(self.alerts_file))
+                counts = self._count_alerts_by_level(alerts)
+                self._alerts_cache = (version, alerts, counts)
+            return alerts, counts
+    
+    def generate_report(self, legacy_metrics, native_metrics, alerts, alert_counts=None, source_key=None):
         """Generate both HTML and Markdown reports
         
         Args:
             legacy_metrics: Dictionary of legacy (WSL) metrics
             native_metrics: Dictionary of native (Windows) metrics
             alerts: List of alert dictionaries
+            alert_counts: Optional precomputed counts by level for alerts
+                (as returned by get_alerts); counted here if omitted
+            source_key: Optional hashable identifying the input versions
+                (e.g. file mtimes); a repeat call with the same key returns
+                the reports already generated for it
             
         Returns:
             Tuple of (html_path, markdown_path)
         """
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if source_key is not None:
+            with self._report_memo_lock:
+                cached = self._report_memo.get(source_key)
+                if cached is not None and all(p.exists() for p in cached):
+                    self._report_memo.move_to_end(source_key)
+                    return cached
+        
+        # One clock read, so the filename and the generated_at field always agree
+        now = datetime.now()
+        timestamp = now.strftime('%Y%m%d_%H%M%S')
         
         # Prepare report data
         report_data = {
-            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'generated_at': now.strftime('%Y-%m-%d %H:%M:%S'),
             'legacy': legacy_metrics,
             'native': native_metrics,
             'alerts': alerts,
-            'alert_counts': self._count_alerts_by_level(alerts),
+            'alert_counts': alert_counts if alert_counts is not None else self._count_alerts_by_level(alerts),
             'summary_legacy': self._generate_summary(legacy_metrics),
             'summary_native': self._generate_summary(native_metrics)
         }
         
-        # Generate HTML report
-        html_template = self.env.get_template('report_template.html')
-        html_content = html_template.render(**report_data)
+        # Generate HTML report (streamed to disk, never held as one string)
         html_filename = f'report_{timestamp}.html'
         html_path = self.html_dir / html_filename
-        html_path.write_text(html_content, encoding='utf-8')
+        self._dump_report(self.html_template, report_data, html_path)
         
         # Generate Markdown report
-        md_template = self.env.get_template('report_template.md')
-        md_content = md_template.render(**report_data)
         md_filename = f'report_{timestamp}.md'
         md_path = self.markdown_dir / md_filename
-        md_path.write_text(md_content, encoding='utf-8')
+        self._dump_report(self.md_template, report_data, md_path)
+        
+        if source_key is not None:
+            with self._report_memo_lock:
+                self._report_memo[source_key] = (html_path, md_path)
+                self._report_memo.move_to_end(source_key)
+                while len(self._report_memo) > REPORT_MEMO_SIZE:
+                    self._report_memo.popitem(last=False)
         
         return html_path, md_path
     
+    def _dump_report(self, template, report_data, path):
+        """Stream a rendered template to path, replacing it only once rendering succeeded"""
+        # The temp name doesn't match report_*, so list_reports and the
+        # download route never see a half-written report; pid and thread id
+        # keep concurrent workers from sharing one
+        tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            with open(tmp_path, 'wb') as f:
+                template.stream(**report_data).dump(f, encoding='utf-8')
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    
     def _count_alerts_by_level(self, alerts):
         """Count alerts by severity level"""
         counts = {'critical': 0, 'warning': 0, 'info': 0}
@@ -131,12 +214,13 @@ class ReportGenerator:
         if not alerts:
             return counts
         if not isinstance(alerts, list):
-            alerts = []
-        for alert in alerts:
-            if isinstance(alert, dict):
-                level = alert.get('level', 'info').lower()
-                if level in counts:
-                    counts[level] += 1
+            return counts
+        levels = Counter(
+            alert.get('level', 'info').lower()
+            for alert in alerts if isinstance(alert, dict)
+        )
+        for level in counts:
+            counts[level] = levels[level]
         return counts
     
     def _generate_summary(self, metrics):
@@ -183,53 +267,45 @@ class ReportGenerator:
         temp = metrics.get('temperature', {})
         if isinstance(temp, dict):
             gpus = temp.get('gpus', [])
-            if isinstance(gpus, list):
-                summary['gpu_count'] = len(gpus)
-            
-            # Get maximum temperature
-            temps = []
-            cpu_temp = temp.get('cpu_celsius')
-            if cpu_temp and cpu_temp > 0:
-                temps.append(cpu_temp)
+            if not isinstance(gpus, list):
+                gpus = []
+            summary['gpu_count'] = len(gpus)
             
-            if isinstance(gpus, list):
-                for gpu in gpus:
-                    if isinstance(gpu, dict):
-                        gpu_temp = gpu.get('temperature_celsius')
-                        if gpu_temp and gpu_temp > 0:
-                            temps.append(gpu_temp)
-            
-            summary['temperature_max'] = max(temps) if temps else 0
+            # Maximum of the CPU and GPU readings, in one pass without a temp list
+            gpu_temps = (gpu.get('temperature_celsius') or 0 for gpu in gpus if isinstance(gpu, dict))
+            summary['temperature_max'] = max(
+                (t for t in (temp.get('cpu_celsius') or 0, *gpu_temps) if t > 0),
+                default=0
+            )
         
         return summary
     
+    def _scan_reports(self, directory, suffix, report_type, reports):
+        """Append report_*<suffix> files in directory to reports, in one scandir pass"""
+        # Path relative to the reports parent, computed once per directory
+        prefix = str(directory.relative_to(self.reports_dir.parent))
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if not (name.startswith('report_') and name.endswith(suffix)):
+                    continue
+                stat = entry.stat()
+                reports.append({
+                    'type': report_type,
+                    'filename': name,
+                    'size': stat.st_size,
+                    'created': datetime.fromtimestamp(stat.st_ctime).isoformat(),
+                    'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                    'path': os.path.join(prefix, name)
+                })
+    
     def list_reports(self):
         """List all generated reports"""
         reports = []
         
-        # List HTML reports
-        for html_file in self.html_dir.glob('report_*.html'):
-            stat = html_file.stat()
-            reports.append({
-                'type': 'html',
-                'filename': html_file.name,
-                'size': stat.st_size,
-                'created': datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                'path': str(html_file.relative_to(self.reports_dir.parent))
-            })
-        
-        # List Markdown reports
-        for md_file in self.markdown_dir.glob('report_*.md'):
-            stat = md_file.stat()
-            reports.append({
-                'type': 'markdown',
-                'filename': md_file.name,
-                'size': stat.st_size,
-                'created': datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                'path': str(md_file.relative_to(self.reports_dir.parent))
-            })
+        # List HTML and Markdown reports
+        self._scan_reports(self.html_dir, '.html', 'html', reports)
+        self._scan_reports(self.markdown_dir, '.md', 'markdown', reports)
         
         # Sort by creation time (newest first)
         reports.sort(key=lambda r: r['created'], reverse=True)